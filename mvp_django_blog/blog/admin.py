@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html
 
 from .models import Category, Location, Post
 
@@ -20,24 +22,45 @@ class PostAdmin(admin.ModelAdmin):
     )
 
     search_fields = ('title',)
+    autocomplete_fields = ('category', 'location', 'author')
     list_filter = ('category', 'location')
     list_display_links = ('title',)
     empty_value_display = 'Не задано'
+    list_select_related = ('category', 'location', 'author')
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'category', 'location', 'author'
+        )
 
-class PostInline(admin.TabularInline):
-    model = Post
-    extra = 0
 
+class PostsLinkMixin:
+    posts_filter = None
 
-class CategoryAdmin(admin.ModelAdmin):
-    inlines = (PostInline, )
+    @admin.display(description='Публикации')
+    def posts_link(self, obj):
+        if obj.pk is None:
+            return self.get_empty_value_display()
+        return format_html(
+            '<a href="{}?{}__id__exact={}">Смотреть публикации</a>',
+            reverse('admin:blog_post_changelist'),
+            self.posts_filter,
+            obj.id
+        )
+
+
+class CategoryAdmin(PostsLinkMixin, admin.ModelAdmin):
     list_display = ('title', )
+    search_fields = ('title',)
+    readonly_fields = ('posts_link',)
+    posts_filter = 'category'
 
 
-class LocationAdmin(admin.ModelAdmin):
-    inlines = (PostInline, )
+class LocationAdmin(PostsLinkMixin, admin.ModelAdmin):
     list_display = ('name', )
+    search_fields = ('name',)
+    readonly_fields = ('posts_link',)
+    posts_filter = 'location'
 
 
 admin.site.register(Category, CategoryAdmin)
@@ -1,12 +1,43 @@
 from django.db import models
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 
 from core.models import CommonData
 
 User = get_user_model()
 
 
+class PostQuerySet(models.QuerySet):
+
+    def published(self):
+        return self.filter(is_published=True, pub_date__lte=timezone.now())
+
+    def with_comment_counts(self):
+        comments = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            count=Count('pk')
+        ).values('count')
+        return self.annotate(
+            comment_count=Coalesce(
+                Subquery(comments, output_field=models.IntegerField()), 0
+            )
+        )
+
+    def for_feed(self):
+        return self.published().filter(
+            Exists(Category.objects.filter(
+                pk=OuterRef('category_id'), is_published=True
+            ))
+        )
+
+    def for_author(self, user):
+        return self.filter(author=user)
+
+
 class Post(CommonData):
     title = models.CharField(max_length=256, verbose_name='Заголовок')
     text = models.TextField(verbose_name='Текст')
@@ -38,10 +69,27 @@ class Post(CommonData):
         blank=True
     )
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date', 'title',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', 'title'),
+                name='post_pubdate_title_idx',
+                condition=Q(is_published=True)
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pubdate_idx'
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_pubdate_idx'
+            ),
+        )
 
     def get_absolute_url(self):
         return reverse("blog:post_detail", kwargs={"post_id": self.id})
@@ -82,7 +130,7 @@ class Location(CommonData):
 
 class Comment(models.Model):
     text = models.TextField(verbose_name='Текст комментария')
-    posts = models.ForeignKey(
+    post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
         related_name='comments'
@@ -92,3 +140,9 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx'
+            ),
+        )
@@ -1,3 +1,166 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+from blog.views import (
+    CategoryListView, EditComment, HomePage, PostEditView, ProfileView
+)
+
+User = get_user_model()
+
+POSTS_COUNT = 12
+
+
+class PostsPaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.category = Category.objects.create(
+            title='Категория', description='Описание', slug='category'
+        )
+        cls.location = Location.objects.create(name='Место')
+        now = timezone.now()
+        cls.posts = [
+            Post.objects.create(
+                title=f'Публикация {index}',
+                text='Текст',
+                pub_date=now - timedelta(days=index),
+                author=cls.author,
+                category=cls.category,
+                location=cls.location,
+            )
+            for index in range(POSTS_COUNT)
+        ]
+        for _ in range(3):
+            Comment.objects.create(
+                text='Комментарий', post=cls.posts[0], author=cls.author
+            )
+        Comment.objects.create(
+            text='Комментарий', post=cls.posts[1], author=cls.author
+        )
+        cls.factory = RequestFactory()
+
+    def get_page_obj(self, view, page=None, **kwargs):
+        request = self.factory.get('/', {'page': page} if page else {})
+        request.user = AnonymousUser()
+        response = view.as_view()(request, **kwargs)
+        return response.context_data['page_obj']
+
+    def get_feeds(self):
+        return (
+            (HomePage, {}),
+            (ProfileView, {'username': self.author.username}),
+            (CategoryListView, {'category_slug': self.category.slug}),
+        )
+
+    def test_page_contents(self):
+        for view, kwargs in self.get_feeds():
+            with self.subTest(view=view.__name__):
+                first_page = self.get_page_obj(view, **kwargs)
+                second_page = self.get_page_obj(view, page=2, **kwargs)
+                self.assertEqual(
+                    list(first_page.object_list), self.posts[:10]
+                )
+                self.assertEqual(
+                    list(second_page.object_list), self.posts[10:]
+                )
+                self.assertEqual(first_page.paginator.count, POSTS_COUNT)
+
+    def test_page_order(self):
+        self.posts[1].pub_date = self.posts[0].pub_date
+        self.posts[1].title = 'А'
+        self.posts[1].save()
+        for view, kwargs in self.get_feeds():
+            with self.subTest(view=view.__name__):
+                page_obj = self.get_page_obj(view, **kwargs)
+                self.assertEqual(
+                    list(page_obj.object_list[:2]),
+                    [self.posts[1], self.posts[0]]
+                )
+
+    def test_comment_count(self):
+        expected = {self.posts[0].pk: 3, self.posts[1].pk: 1}
+        for view, kwargs in self.get_feeds():
+            with self.subTest(view=view.__name__):
+                page_obj = self.get_page_obj(view, **kwargs)
+                self.assertEqual(
+                    {post.pk: post.comment_count for post in page_obj},
+                    {post.pk: expected.get(post.pk, 0) for post in page_obj}
+                )
+
+    def test_category_page_reuses_loaded_category(self):
+        with self.assertNumQueries(5):
+            page_obj = self.get_page_obj(
+                CategoryListView, category_slug=self.category.slug
+            )
+            for post in page_obj:
+                self.assertEqual(post.category, self.category)
+                self.assertEqual(post.location, self.location)
+
+    def test_invalid_page_falls_back(self):
+        for view, kwargs in self.get_feeds()[1:]:
+            with self.subTest(view=view.__name__):
+                self.assertEqual(
+                    self.get_page_obj(view, page='abc', **kwargs).number, 1
+                )
+                self.assertEqual(
+                    self.get_page_obj(view, page=99, **kwargs).number, 2
+                )
+
+    def test_home_page_last(self):
+        self.assertEqual(self.get_page_obj(HomePage, page='last').number, 2)
+        with self.assertRaises(Http404):
+            self.get_page_obj(HomePage, page=99)
+
+class AuthorEditTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(
+            title='Публикация',
+            text='Текст',
+            pub_date=timezone.now(),
+            author=cls.author,
+        )
+        cls.comment = Comment.objects.create(
+            text='Комментарий', post=cls.post, author=cls.author
+        )
+        cls.factory = RequestFactory()
+
+    def get_response(self, view, user, **kwargs):
+        request = self.factory.get('/')
+        request.user = user
+        return view.as_view()(request, **kwargs)
+
+    def test_not_author_is_redirected_to_post(self):
+        cases = (
+            (PostEditView, {'post_id': self.post.id}),
+            (EditComment, {
+                'post_id': self.post.id, 'comment_id': self.comment.id
+            }),
+        )
+        for view, kwargs in cases:
+            with self.subTest(view=view.__name__):
+                response = self.get_response(view, self.reader, **kwargs)
+                self.assertEqual(response.status_code, 302)
+                self.assertEqual(response.url, self.post.get_absolute_url())
+
+    def test_missing_object_raises_404(self):
+        cases = (
+            (PostEditView, {'post_id': self.post.id + 1}),
+            (EditComment, {
+                'post_id': self.post.id, 'comment_id': self.comment.id + 1
+            }),
+        )
+        for view, kwargs in cases:
+            with self.subTest(view=view.__name__):
+                with self.assertRaises(Http404):
+                    self.get_response(view, self.author, **kwargs)
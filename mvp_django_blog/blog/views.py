@@ -1,8 +1,7 @@
-from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 from django.contrib.auth import get_user_model
-from django.core.paginator import Paginator
+from django.core.paginator import Page, Paginator
 from django.forms.models import BaseModelForm
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, redirect
@@ -11,41 +10,72 @@ from django.views.generic import (
     CreateView, DetailView, DeleteView, ListView, UpdateView
 )
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
+from django.db.models import Prefetch, QuerySet
 
 from blog.models import Post, Category, Comment
 from blog.forms import CommentForm, PostForms, ProfileEditForm
 
 
-COMMENT_CONST = 'comments'
-COMMENT_ID_CONST = 'comment_id'
-CUT_SLUG = 'category_slug'
 DETAIL_URL = 'blog:post_detail'
-GET_PAGE_CONST = 'page'
 OBJECTS_PER_PAGE = 10
-PAGE_OBJ_CONST = 'page_obj'
 PROFILE_HTML = 'blog/profile.html'
-POST_ID_CONST = 'post_id'
 TABLES_LIST = (
     'category',
     'author',
     'location',
 )
-USERNAME_SLUG = 'username'
 
 
 User = get_user_model()
 
 
+def annotate_posts_page(
+        page_obj: Page, category: Optional[Category] = None
+) -> Page:
+    """
+    Подгружает связанные таблицы и число комментариев только для публикаций
+    текущей страницы, сохраняя порядок её первичных ключей.
+    Если все публикации из одной, уже загруженной категории, она
+    подставляется без повторного запроса.
+    """
+    page_pks = [row['pk'] for row in page_obj.object_list]
+    lookups = ['location']
+    if category is None:
+        lookups.append(Prefetch(
+            'category', queryset=Category.objects.defer('description')
+        ))
+    page_posts = Post.objects.filter(
+        pk__in=page_pks
+    ).select_related('author').prefetch_related(
+        *lookups
+    ).with_comment_counts().in_bulk()
+    page_obj.object_list = [
+        page_posts[pk] for pk in page_pks if pk in page_posts
+    ]
+    if category is not None:
+        for post in page_obj.object_list:
+            post.category = category
+    return page_obj
+
+
+def get_posts_page(
+        request: HttpRequest, posts: QuerySet,
+        category: Optional[Category] = None
+) -> Page:
+    paginator = Paginator(posts.values('pk'), OBJECTS_PER_PAGE)
+    page_number = request.GET.get('page')
+    return annotate_posts_page(paginator.get_page(page_number), category)
+
+
 class ProfileMixin:
     model = User
-    slug_field = USERNAME_SLUG
-    slug_url_kwarg = USERNAME_SLUG
+    slug_field = 'username'
+    slug_url_kwarg = 'username'
 
 
 class PostMixin:
     model = Post
-    pk_url_kwarg = POST_ID_CONST
+    pk_url_kwarg = 'post_id'
 
 
 class PostCreateMixin:
@@ -53,17 +83,17 @@ class PostCreateMixin:
     template_name = 'blog/create.html'
 
 
-class PostEditMixin:
+class AuthorEditMixin:
 
     def dispatch(
             self, request: HttpRequest, *args: Any, **kwargs: Any
     ) -> HttpResponse:
-        instance = get_object_or_404(Post, id=kwargs.get(POST_ID_CONST))
-        if instance.author != request.user:
-            return redirect(
-                DETAIL_URL,
-                post_id=self.kwargs.get(POST_ID_CONST)
-            )
+        author_id = get_object_or_404(
+            self.model.objects.values_list('author_id', flat=True),
+            pk=kwargs[self.pk_url_kwarg]
+        )
+        if author_id != request.user.id:
+            return redirect(DETAIL_URL, post_id=kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
 
 
@@ -73,39 +103,33 @@ class CommentMixin:
     template_name = 'blog/comment.html'
 
 
-class CommentEditMixin:
-    pk_url_kwarg = COMMENT_ID_CONST
-
-    def dispatch(
-            self, request: HttpRequest, *args: Any, **kwargs: Any
-    ) -> HttpResponse:
-        instance = get_object_or_404(Comment, id=kwargs.get(COMMENT_ID_CONST))
-        if instance.author != request.user:
-            return redirect(
-                DETAIL_URL,
-                post_id=self.kwargs.get(POST_ID_CONST)
-            )
-        return super().dispatch(request, *args, **kwargs)
+class CommentEditMixin(AuthorEditMixin):
+    pk_url_kwarg = 'comment_id'
 
     def get_success_url(self) -> str:
         return reverse(
-            DETAIL_URL, kwargs={POST_ID_CONST: self.object.posts_id}
+            DETAIL_URL, kwargs={'post_id': self.object.post_id}
         )
 
 
 class HomePage(ListView):
     model = Post
-    queryset = Post.objects.select_related(*TABLES_LIST).annotate(
-        comment_count=Count(COMMENT_CONST)
-    ).filter(
-        pub_date__lte=datetime.now(),
-        is_published=True,
-        category__is_published=True
-    )
     template_name = 'blog/index.html'
     paginate_by = OBJECTS_PER_PAGE
     ordering = ('-pub_date', 'title',)
 
+    def get_queryset(self) -> QuerySet:
+        return Post.objects.for_feed().order_by(*self.get_ordering())
+
+    def paginate_queryset(
+            self, queryset: QuerySet, page_size: int
+    ) -> Tuple[Paginator, Page, List[Post], bool]:
+        paginator, page, _, is_paginated = super().paginate_queryset(
+            queryset.values('pk'), page_size
+        )
+        page = annotate_posts_page(page)
+        return paginator, page, page.object_list, is_paginated
+
 
 class ProfileView(ProfileMixin, DetailView):
     template_name = PROFILE_HTML
@@ -113,24 +137,10 @@ class ProfileView(ProfileMixin, DetailView):
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        posts = None
-        if self.request.user.is_authenticated:
-            posts = Post.objects.select_related(*TABLES_LIST).annotate(
-                comment_count=Count(COMMENT_CONST)
-            ).filter(
-                author=get_object_or_404(User, username=self.object.username),
-            )
-        else:
-            posts = Post.objects.all().annotate(
-                comment_count=Count(COMMENT_CONST)
-            ).filter(
-                author=get_object_or_404(User, username=self.object.username),
-                is_published=True,
-                pub_date__lte=datetime.now()
-            )
-        paginatror = Paginator(posts, OBJECTS_PER_PAGE)
-        page_number = self.request.GET.get(GET_PAGE_CONST)
-        context[PAGE_OBJ_CONST] = paginatror.get_page(page_number)
+        posts = Post.objects.for_author(self.object)
+        if not self.request.user.is_authenticated:
+            posts = posts.published()
+        context['page_obj'] = get_posts_page(self.request, posts)
         return context
 
 
@@ -140,17 +150,25 @@ class ProfileEditView(ProfileMixin, LoginRequiredMixin, UpdateView):
 
     def get_success_url(self) -> str:
         return reverse(
-            'blog:profile', kwargs={USERNAME_SLUG: self.object.username}
+            'blog:profile', kwargs={'username': self.object.username}
         )
 
 
 class PostDetailView(PostMixin, DetailView):
     template_name = 'blog/detail.html'
 
+    def get_queryset(self) -> QuerySet:
+        return Post.objects.select_related(*TABLES_LIST).prefetch_related(
+            Prefetch(
+                'comments',
+                queryset=Comment.objects.select_related('author')
+            )
+        )
+
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context[COMMENT_CONST] = (
+        context['comments'] = (
             self.object.comments.all()
         )
         return context
@@ -166,26 +184,26 @@ class PostCreatView(
 
     def get_success_url(self) -> str:
         return reverse(
-            'blog:profile', kwargs={USERNAME_SLUG: self.request.user}
+            'blog:profile', kwargs={'username': self.request.user}
         )
 
 
 class PostEditView(
-    PostMixin, PostEditMixin, PostCreateMixin, LoginRequiredMixin, UpdateView
+    PostMixin, AuthorEditMixin, PostCreateMixin, LoginRequiredMixin,
+    UpdateView
 ):
     pass
 
 
 class PostDeleteView(
-    PostMixin, PostEditMixin, PostCreateMixin, LoginRequiredMixin, DeleteView
+    PostMixin, AuthorEditMixin, PostCreateMixin, LoginRequiredMixin,
+    DeleteView
 ):
     success_url = reverse_lazy('blog:index')
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        instance = get_object_or_404(Post, id=self.object.id)
-        form = PostForms(instance=instance)
-        context['form'] = form
+        context['form'] = PostForms(instance=self.object)
         return context
 
 
@@ -195,18 +213,18 @@ class CommentCreateView(CommentMixin, LoginRequiredMixin, CreateView):
     def dispatch(
             self, request: HttpRequest, *args: Any, **kwargs: Any
     ) -> HttpResponse:
-        self.posts = get_object_or_404(Post, id=kwargs.get(POST_ID_CONST))
+        self.posts = get_object_or_404(Post, id=kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
 
     def form_valid(self, form: BaseModelForm) -> HttpResponse:
         form.instance.author = self.request.user
-        form.instance.posts = self.posts
+        form.instance.post = self.posts
         return super().form_valid(form)
 
     def get_success_url(self) -> str:
         return reverse(
             DETAIL_URL,
-            kwargs={POST_ID_CONST: self.posts.id}
+            kwargs={'post_id': self.posts.id}
         )
 
 
@@ -227,20 +245,13 @@ class CategoryListView(DetailView):
     queryset = Category.objects.filter(is_published=True)
     template_name = 'blog/category.html'
     slug_field = 'slug'
-    slug_url_kwarg = CUT_SLUG
+    slug_url_kwarg = 'category_slug'
     context_object_name = 'category'
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        posts = Post.objects.select_related(*TABLES_LIST).annotate(
-            comment_count=Count(COMMENT_CONST)
-        ).filter(
-            category__slug=self.kwargs.get(CUT_SLUG),
-            is_published=True,
-            pub_date__lte=datetime.now()
+        posts = Post.objects.published().filter(category_id=self.object.id)
+        context['page_obj'] = get_posts_page(
+            self.request, posts, category=self.object
         )
-        paginator = Paginator(posts, OBJECTS_PER_PAGE)
-        page_number = self.request.GET.get(GET_PAGE_CONST)
-        page_obj = paginator.get_page(page_number)
-        context[PAGE_OBJ_CONST] = page_obj
         return context